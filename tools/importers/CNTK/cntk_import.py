@@ -48,6 +48,11 @@ def main(argv):
         help="verifies the imported vision ELL model produces the same output as the original CNTK model", action="store_true")
     arg_parser.add_argument("--verify_audio_model",
         help="verifies the imported audio ELL model produces the same output as the original CNTK model", action="store_true")
+    arg_parser.add_argument("--skip_if_current",
+        help="skips the import if the output ELL model is newer than the CNTK model file.\n"
+             "import options such as --step_interval, --lag_threshold and --use_legacy_importer are not compared,\n"
+             "and the import is not skipped when --verify_vision_model or --verify_audio_model is set",
+        action="store_true")
     arg_parser.add_argument("--verbose",
         help="print verbose output during the import. Helps to diagnose ", action="store_true")
 
@@ -77,13 +82,26 @@ def main(argv):
 
     # extract the model if it's in an archive
     unzip = ziptools.Extractor(args['cntk_model_file'])
-    success, filename = unzip.extract_file(".cntk")
-    if success:
-        _logger.info("Extracted: " + filename)
-    else:
+    filename = unzip.get_extracted_path(".cntk")
+    if not filename:
         # not a zip archive
         filename = args['cntk_model_file']
 
+    model_file_name = os.path.splitext(filename)[0] + ".ell"
+
+    # Compare against the file given on the command line, since extracting an archive doesn't keep
+    # its modification time, and against the zipped output if that is what gets saved.
+    # Verification happens during the import, so don't skip it when verification is requested.
+    output_file_name = model_file_name + ".zip" if args["zip_ell_model"] else model_file_name
+    if args["skip_if_current"] and not any(verify_model.values()) and os.path.isfile(output_file_name) and \
+        os.path.getmtime(output_file_name) >= os.path.getmtime(args['cntk_model_file']):
+        _logger.info("Model file '" + output_file_name + "' is up to date, skipping import")
+        return
+
+    success, extracted = unzip.extract_file(".cntk")
+    if success:
+        _logger.info("Extracted: " + extracted)
+
     if not args["use_legacy_importer"]:
         _logger.info("-- Using new importer engine --")
         ell_map = cntk_to_ell.map_from_cntk_model_using_new_engine(filename, step_interval, lag_threshold, plot_model, verify_model)
@@ -93,8 +111,6 @@ def main(argv):
         ell_map = ell.neural.utilities.ell_map_from_predictor(predictor,
             step_interval, lag_threshold)
 
-    model_file_name = os.path.splitext(filename)[0] + ".ell"
-
     _logger.info("\nSaving model file: '" + model_file_name + "'")
     ell_map.Save(model_file_name)
 
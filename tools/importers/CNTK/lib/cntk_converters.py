@@ -28,10 +28,10 @@ from common.importer import *
 _logger = logging.getLogger(__name__)
 
 def get_vector_from_constant(constant, size):
-    # Workaround: For some reason, np.full is not returning a type that SWIG can parse. So just manually walk the array setting the scalar
+    # Workaround: For some reason, np.full is not returning a type that SWIG can parse. So just broadcast
+    # the scalar into an explicitly typed array.
     array = np.zeros(size, dtype=np.float)
-    for i in range(array.size):
-        array[i] = constant
+    array[:] = constant
     return array
 
 
@@ -40,15 +40,7 @@ def get_vector_from_cntk_trainable_parameter(tensorParameter):
        Note that ELL's ordering is row, column, channel.
        CNTK has them in filter, channel, row, column order.
     """
-    tensorShape = tensorParameter.shape
-    tensorValue = tensorParameter.value
-
-    orderedWeights = np.zeros(tensorValue.size, dtype=np.float)
-    i = 0
-    for columnValue in tensorValue:
-        orderedWeights[i] = columnValue
-        i += 1
-    return orderedWeights
+    return np.ascontiguousarray(tensorParameter.value, dtype=np.float).ravel()
 
 
 def get_vector_from_cntk_array(inputArray):
@@ -57,48 +49,22 @@ def get_vector_from_cntk_array(inputArray):
        ELL's ordering is row, column, channel.
     """
     tensorShape = inputArray.shape
-    orderedWeights = np.zeros(inputArray.size, dtype=np.float)
     if (len(tensorShape) == 4):
-        i = 0
-        for filter in range(tensorShape[0]):
-            for row in range(tensorShape[2]):
-                for column in range(tensorShape[3]):
-                    for channel in range(tensorShape[1]):
-                        orderedWeights[i] = inputArray[filter][channel][row][column]
-                        i += 1
-        # Reshape to (filters * rows, columns, channels)
-        orderedWeights = orderedWeights.reshape(
-            tensorShape[0] * tensorShape[2], tensorShape[3], tensorShape[1])
+        # Reorder to (filters, rows, columns, channels)
+        orderedWeights = np.transpose(inputArray, (0, 2, 3, 1))
     elif (len(tensorShape) == 3):
-        i = 0
-        for row in range(tensorShape[1]):
-            for column in range(tensorShape[2]):
-                for channel in range(tensorShape[0]):
-                    orderedWeights[i] = inputArray[channel][row][column]
-                    i += 1
-        # Reshape to (rows, columns, channels)
-        orderedWeights = orderedWeights.reshape(
-            tensorShape[1], tensorShape[2], tensorShape[0])
+        # Reorder to (rows, columns, channels)
+        orderedWeights = np.transpose(inputArray, (1, 2, 0))
     elif (len(tensorShape) == 2):
-        i = 0
-        for row in range(tensorShape[1]):
-            for column in range(tensorShape[0]):
-                orderedWeights[i] = inputArray[column][row]
-                i += 1
-        # Reshape to (rows, 1, channels)
-        orderedWeights = orderedWeights.reshape(
-            tensorShape[1], 1, tensorShape[0])
+        # Reorder to (rows, channels)
+        orderedWeights = np.transpose(inputArray)
     elif (len(tensorShape) == 1):
-        i = 0
-        for columnValue in inputArray:
-            orderedWeights[i] = columnValue
-            i += 1
-        # Reshape to (1, 1, channels)
-        orderedWeights = orderedWeights.reshape(1, 1, inputArray.size)
+        orderedWeights = inputArray
     else:
         _logger.error("Error: Input array has incorrect dimensions")
         return None
-    return np.ravel(orderedWeights)
+    # Copy to the ELL ordering in a single pass
+    return np.array(orderedWeights, dtype=np.float, order='C').ravel()
 
 
 def get_tensor_from_cntk_dense_weight_parameter(tensorParameter):
@@ -107,27 +73,28 @@ def get_tensor_from_cntk_dense_weight_parameter(tensorParameter):
        CNTK has them in channel, row, column, filter order.
        4D parameters are converted to ELL Tensor by stacking vertically in the row dimension.
     """
-    tensorShape = tensorParameter.shape
-    tensorValue = tensorParameter.value
+    return get_tensor_from_cntk_dense_weight_value_shape(tensorParameter.value, tensorParameter.shape)
+
 
-    # orderedWeights = tensorValue
+def get_tensor_from_cntk_dense_weight_value_shape(tensorValue, tensorShape):
+    """Returns an ell.math.DoubleTensor from a trainable parameter
+       Note that ELL's ordering is row, column, channel.
+       CNTK has them in channel, row, column, filter order.
+       4D parameters are converted to ELL Tensor by stacking vertically in the row dimension.
+    """
     if (len(tensorShape) == 4):
-        orderedWeights = tensorValue
-        orderedWeights = np.moveaxis(orderedWeights, 0, -1)
-        orderedWeights = np.moveaxis(orderedWeights, 2, 0)
-        orderedWeights = orderedWeights.ravel().astype(np.float).reshape(
+        # channel, row, column, filter => filter, row, column, channel
+        orderedWeights = np.moveaxis(np.moveaxis(tensorValue, 0, -1), 2, 0)
+        orderedWeights = np.ascontiguousarray(orderedWeights, dtype=np.float).reshape(
             tensorShape[3] * tensorShape[1], tensorShape[2], tensorShape[0])
     elif (len(tensorShape) == 3):
-        orderedWeights = np.moveaxis(tensorValue, 0, -1)
-        orderedWeights = orderedWeights.ravel().astype(np.float).reshape(
+        orderedWeights = np.ascontiguousarray(np.moveaxis(tensorValue, 0, -1), dtype=np.float).reshape(
             tensorShape[1], tensorShape[2], tensorShape[0])
     elif (len(tensorShape) == 2):
-        orderedWeights = np.moveaxis(tensorValue, 0, -1)
-        orderedWeights = orderedWeights.ravel().astype(
-            np.float).reshape(tensorShape[1], 1, tensorShape[0])
+        orderedWeights = np.ascontiguousarray(np.moveaxis(tensorValue, 0, -1), dtype=np.float).reshape(
+            tensorShape[1], 1, tensorShape[0])
     else:
-        orderedWeights = tensorValue.ravel().astype(
-            np.float).reshape(1, 1, tensorValue.size)
+        orderedWeights = np.ascontiguousarray(tensorValue, dtype=np.float).reshape(1, 1, tensorValue.size)
     return ell.math.DoubleTensor(orderedWeights)
 
 def get_tensor_from_cntk_convolutional_weight_parameter(tensorParameter):
@@ -136,8 +103,6 @@ def get_tensor_from_cntk_convolutional_weight_parameter(tensorParameter):
        4D parameters (e.g. those that represent convolutional weights) are stacked vertically in the row dimension.
        CNTK has them in filter, channel, row, column order.
     """
-    tensorShape = tensorParameter.shape
-    tensorValue = tensorParameter.value
     return get_tensor_from_cntk_convolutional_weight_value_shape(tensorParameter.value, tensorParameter.shape)
 
 
@@ -146,22 +111,21 @@ def get_tensor_from_cntk_convolutional_weight_value_shape(tensorValue, tensorSha
        Note that ELL's ordering is row, column, channel.
        4D parameters (e.g. those that represent convolutional weights) are stacked vertically in the row dimension.
        CNTK has them in filter, channel, row, column order.
+       The weights are reordered into the layout ELL's convolution expects here, once at import time,
+       with a single copy.
     """
     if (len(tensorShape) == 4):
-        orderedWeights = np.moveaxis(tensorValue, 1, -1)
-        orderedWeights = orderedWeights.ravel().astype(np.float).reshape(
+        # filter, channel, row, column => filter, row, column, channel
+        orderedWeights = np.ascontiguousarray(np.transpose(tensorValue, (0, 2, 3, 1)), dtype=np.float).reshape(
             tensorShape[0] * tensorShape[2], tensorShape[3], tensorShape[1])
     elif (len(tensorShape) == 3):
-        orderedWeights = np.moveaxis(tensorValue, 0, -1)
-        orderedWeights = orderedWeights.ravel().astype(np.float).reshape(
+        orderedWeights = np.ascontiguousarray(np.moveaxis(tensorValue, 0, -1), dtype=np.float).reshape(
             tensorShape[1], tensorShape[2], tensorShape[0])
     elif (len(tensorShape) == 2):
-        orderedWeights = np.moveaxis(tensorValue, 0, -1)
-        orderedWeights = orderedWeights.ravel().astype(
-            np.float).reshape(tensorShape[1], tensorShape[0], 1)
+        orderedWeights = np.ascontiguousarray(np.moveaxis(tensorValue, 0, -1), dtype=np.float).reshape(
+            tensorShape[1], tensorShape[0], 1)
     else:
-        orderedWeights = tensorValue.ravel().astype(
-            np.float).reshape(1, 1, tensorValue.size)
+        orderedWeights = np.ascontiguousarray(tensorValue, dtype=np.float).reshape(1, 1, tensorValue.size)
     return ell.math.DoubleTensor(orderedWeights)
 
 
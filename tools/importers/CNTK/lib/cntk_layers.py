@@ -10,7 +10,9 @@
 
 """Imports CNTK layers to ELL equivalents"""
 import logging
+import sys
 
+import numpy as np
 from cntk.initializer import glorot_uniform, he_normal
 from cntk.layers import Convolution, MaxPooling, AveragePooling, Dropout, BatchNormalization, Dense
 import cntk.layers.blocks
@@ -30,10 +32,20 @@ _logger = logging.getLogger(__name__)
 class BaseLayer:
     """Base class with common layer processing functionality"""
 
+    # Layer objects are created for every relevant CNTK layer, so avoid a __dict__ per instance.
+    # Derived classes declare the attributes they add in their own __slots__.
+    __slots__ = ('layer', 'op_name', 'input_shape', 'additional_layer_text', 'input_scale', 'indexed_parameters',
+                 'indexed_constants')
+
+    # Whether a constant scale of the input can be folded into this layer, see fold_input_scale
+    folds_input_scale = False
+
     def __init__(self, layer):
         self.layer = layer
         self.layer.ell_inputPaddingParameters = self.get_input_padding_parameters()
         self.additional_layer_text = None
+        # Constant scale applied to the input, folded in from a preceding ElementTimes layer
+        self.input_scale = 1.0
 
         if not hasattr(self, 'input_shape'):
             if (len(self.layer.arguments) > 0 and len(self.layer.arguments[0].shape) > 0):
@@ -59,12 +71,83 @@ class BaseLayer:
                          str(self.layer.ell_inputPaddingParameters.paddingSize),
                          str(self.layer.ell_outputPaddingParameters.paddingSize))
 
+    def find_parameter(self, name, index=0):
+        """Returns the CNTK layer's parameter matching name, see utilities.find_parameter_by_name.
+           The parameters are indexed by name on first use, so later lookups don't scan them.
+        """
+        if getattr(self, 'indexed_parameters', None) is None:
+            self.indexed_parameters = utilities.index_parameters_by_name(self.layer.parameters)
+        return utilities.find_indexed_parameter_by_name(self.indexed_parameters, name, index)
+
+    def find_constant(self, name, index=0):
+        """Returns the CNTK layer's constant matching name, see utilities.find_parameter_by_name.
+           The constants are indexed by name on first use, so later lookups don't scan them.
+        """
+        if getattr(self, 'indexed_constants', None) is None:
+            self.indexed_constants = utilities.index_parameters_by_name(self.layer.constants)
+        return utilities.find_indexed_parameter_by_name(self.indexed_constants, name, index)
+
     def get_input_padding_parameters(self):
         """Returns the default ell.neural.PaddingParameters for a layer's input.
            Derived classes may override this.
         """
 
-        return ell.neural.PaddingParameters(ell.neural.PaddingScheme.zeros, 0)
+        return utilities.get_padding_parameters(ell.neural.PaddingScheme.zeros, 0)
+
+    def fold_input_scale(self, scale):
+        """Folds a constant scale of this layer's input into this layer's weights.
+           Returns True if the scale was folded, which is only possible for derived classes that set
+           folds_input_scale and apply self.input_scale when processed and cloned.
+        """
+
+        if not self.folds_input_scale:
+            return False
+        self.input_scale *= scale
+        return True
+
+    def get_scaled_weights_tensor(self, weightsParameter, fromParameter, fromValueShape):
+        """Returns the ELL tensor for weightsParameter, with the folded input scale applied.
+           fromParameter converts the CNTK parameter, fromValueShape converts a scaled value and shape.
+        """
+
+        if (self.input_scale != 1.0):
+            return fromValueShape(weightsParameter.value * self.input_scale, weightsParameter.shape)
+        return fromParameter(weightsParameter)
+
+    def get_scaled_clone_input(self, feature):
+        """Returns the feature for a CNTK clone of this layer, with the folded input scale applied"""
+
+        if (self.input_scale != 1.0):
+            return element_times(feature, self.input_scale)
+        return feature
+
+    def get_only_layer_parameters(self):
+        """Returns the ell.neural.LayerParameters when this layer is imported as a single ELL layer"""
+
+        return utilities.get_layer_parameters(
+            self.layer.ell_inputShape, self.layer.ell_inputPaddingParameters, self.layer.ell_outputShape,
+            self.layer.ell_outputPaddingParameters, ell.nodes.PortType.smallReal)
+
+    def get_first_layer_parameters(self):
+        """Returns the ell.neural.LayerParameters for the first of several ELL layers importing this layer"""
+
+        return utilities.get_layer_parameters(
+            self.layer.ell_inputShape, self.layer.ell_inputPaddingParameters, self.layer.ell_outputShapeMinusPadding,
+            utilities.get_no_padding(), ell.nodes.PortType.smallReal)
+
+    def get_middle_layer_parameters(self):
+        """Returns the ell.neural.LayerParameters for ELL layers between the first and the last"""
+
+        return utilities.get_layer_parameters(
+            self.layer.ell_outputShapeMinusPadding, utilities.get_no_padding(), self.layer.ell_outputShapeMinusPadding,
+            utilities.get_no_padding(), ell.nodes.PortType.smallReal)
+
+    def get_last_layer_parameters(self):
+        """Returns the ell.neural.LayerParameters for the last of several ELL layers importing this layer"""
+
+        return utilities.get_layer_parameters(
+            self.layer.ell_outputShapeMinusPadding, utilities.get_no_padding(), self.layer.ell_outputShape,
+            self.layer.ell_outputPaddingParameters, ell.nodes.PortType.smallReal)
 
     def set_output_characteristics(self, nextLayer):
         """Sets the output characteristics based on the next layer"""
@@ -77,9 +160,9 @@ class BaseLayer:
                 self.layer.output.shape)
         else:
             # last layer
-            self.layer.ell_outputPaddingParameters = ell.neural.NoPadding()
+            self.layer.ell_outputPaddingParameters = utilities.get_no_padding()
             self.layer.ell_outputShape = utilities.get_adjusted_shape(
-                self.layer.output.shape, ell.neural.NoPadding())
+                self.layer.output.shape, utilities.get_no_padding())
             self.layer.ell_outputShapeMinusPadding = self.layer.ell_outputShape
 
     def process(self, ellLayers):
@@ -98,6 +181,9 @@ class BaseLayer:
 class DenseLayer(BaseLayer):
     """Logic for converting a CNTK Dense layer to ELL"""
 
+    __slots__ = ()
+    folds_input_scale = True
+
     def __init__(self, layer):
         if not layer.is_block:
             raise ValueError("Dense node is not a block node")
@@ -118,63 +204,54 @@ class DenseLayer(BaseLayer):
         # Therefore, make sure the output padding characteristics of the last layer reflect the next layer's
         # padding requirements.
 
-        weightsParameter = utilities.find_parameter_by_name(
-            self.layer.parameters, 'W', 0)
-        biasParameter = utilities.find_parameter_by_name(
-            self.layer.parameters, 'b', 1)
-        weightsTensor = converters.get_tensor_from_cntk_dense_weight_parameter(
-            weightsParameter)
+        weightsParameter = self.find_parameter('W', 0)
+        biasParameter = self.find_parameter('b', 1)
+        weightsTensor = self.get_scaled_weights_tensor(
+            weightsParameter, converters.get_tensor_from_cntk_dense_weight_parameter,
+            converters.get_tensor_from_cntk_dense_weight_value_shape)
         biasVector = converters.get_vector_from_cntk_trainable_parameter(
             biasParameter)
 
-        # Create the ell.neural.LayerParameters for the various ELL layers
-        firstLayerParameters = ell.neural.LayerParameters(
-            self.layer.ell_inputShape, self.layer.ell_inputPaddingParameters, self.layer.ell_outputShapeMinusPadding, 
-            ell.neural.NoPadding(), ell.nodes.PortType.smallReal)
-        middleLayerParameters = ell.neural.LayerParameters(self.layer.ell_outputShapeMinusPadding, ell.neural.NoPadding(), 
-            self.layer.ell_outputShapeMinusPadding, ell.neural.NoPadding(), ell.nodes.PortType.smallReal)
-        lastLayerParameters = ell.neural.LayerParameters(self.layer.ell_outputShapeMinusPadding, ell.neural.NoPadding(), 
-            self.layer.ell_outputShape, self.layer.ell_outputPaddingParameters, ell.nodes.PortType.smallReal)
-
-        layerParameters = firstLayerParameters
+        layerParameters = self.get_first_layer_parameters()
 
         internalNodes = utilities.get_model_layers(self.layer.block_root)
         activationType = utilities.get_ell_activation_type(internalNodes)
+        isSoftmaxActivation = utilities.is_softmax_activation(internalNodes)
+        hasActivation = isSoftmaxActivation or activationType != None
 
         # Create the ELL fully connected layer
         ellLayers.append(ell.neural.FullyConnectedLayer(
             layerParameters, weightsTensor))
 
         # Create the ELL bias layer
-        if (utilities.is_softmax_activation(internalNodes) or activationType != None):
-            layerParameters = middleLayerParameters
+        if (hasActivation):
+            layerParameters = self.get_middle_layer_parameters()
         else:
-            layerParameters = lastLayerParameters
+            layerParameters = self.get_last_layer_parameters()
         ellLayers.append(ell.neural.BiasLayer(layerParameters, biasVector))
 
         # Create the ELL activation layer
-        if (utilities.is_softmax_activation(internalNodes) or activationType != None):
-            layerParameters = lastLayerParameters
+        if (hasActivation):
+            layerParameters = self.get_last_layer_parameters()
 
             # Special case: if this is softmax activation, create an ELL Softmax layer.
             # Else, insert an ELL ActivationLayer
-            if (utilities.is_softmax_activation(internalNodes)):
+            if (isSoftmaxActivation):
                 ellLayers.append(ell.neural.SoftmaxLayer(layerParameters))
             else:
-                if (activationType != None):
-                    ellLayers.append(ell.neural.ActivationLayer(
-                        layerParameters, activationType))
+                ellLayers.append(ell.neural.ActivationLayer(
+                    layerParameters, activationType))
 
     def clone_cntk_layer(self, feature):
         """Returns a clone of the CNTK layer for per-layer forward prop validation"""
-        weightsParameter = utilities.find_parameter_by_name(
-            self.layer.parameters, 'W', 0)
-        biasParameter = utilities.find_parameter_by_name(
-            self.layer.parameters, 'b', 1)
+        weightsParameter = self.find_parameter('W', 0)
+        biasParameter = self.find_parameter('b', 1)
 
         internalNodes = utilities.get_model_layers(self.layer.block_root)
         activationType = utilities.get_cntk_activation_op(internalNodes)
 
+        feature = self.get_scaled_clone_input(feature)
+
         includeBias = biasParameter is not None
         layer = Dense(self.layer.shape, activation=activationType, bias=includeBias)(feature)
 
@@ -186,8 +263,12 @@ class DenseLayer(BaseLayer):
 class BinaryConvolutionLayer(BaseLayer):
     """Logic for converting a CNTK Binary Convolution layer to ELL"""
 
-    def __init__(self, layer):
-        if layer.is_block:
+    __slots__ = ('input_parameter', 'weights_parameter', 'weights_scale', 'attributes', 'convolution_method')
+
+    def __init__(self, layer, isBlock=None):
+        if isBlock is None:
+            isBlock = layer.is_block
+        if isBlock:
             raise ValueError(
                 "Error: Binary Convolution layer node is in block node")
 
@@ -241,7 +322,7 @@ class BinaryConvolutionLayer(BaseLayer):
         else:
             padding = self.attributes['upperPad'][0]
 
-        return ell.neural.PaddingParameters(paddingScheme, padding)
+        return utilities.get_padding_parameters(paddingScheme, padding)
 
     def process(self, ellLayers):
         """Helper to convert a binary convolutional layer to the ELL equivalent."""
@@ -251,9 +332,7 @@ class BinaryConvolutionLayer(BaseLayer):
         weightsTensor = converters.get_tensor_from_cntk_convolutional_weight_parameter(
             self.weights_parameter)
 
-        layerParameters = ell.neural.LayerParameters(
-            self.layer.ell_inputShape, self.layer.ell_inputPaddingParameters, self.layer.ell_outputShape,
-            self.layer.ell_outputPaddingParameters, ell.nodes.PortType.smallReal)
+        layerParameters = self.get_only_layer_parameters()
 
         # Fill in the convolutional parameters
         weightsShape = self.weights_parameter.shape
@@ -284,18 +363,22 @@ class BinaryConvolutionLayer(BaseLayer):
 class ConvolutionLayer(BaseLayer):
     """Logic for converting a CNTK Convolution layer to ELL"""
 
-    def __init__(self, layer):
-        if not layer.is_block:
+    __slots__ = ('input_parameter', 'weights_parameter', 'bias_parameter', 'attributes', 'convolution_method')
+    folds_input_scale = True
+
+    def __init__(self, layer, isBlock=None):
+        if isBlock is None:
+            isBlock = layer.is_block
+        if not isBlock:
             raise ValueError(
                 "Error: Convolution layer node is not in block node")
 
         self.op_name = 'Convolution'
+        self.layer = layer
         # initialize weights and input characteristics
         self.input_parameter = layer.arguments[0]
-        self.weights_parameter = utilities.find_parameter_by_name(
-            layer.parameters, 'W', 0)
-        self.bias_parameter = utilities.find_parameter_by_name(
-            layer.parameters, 'b', 1)
+        self.weights_parameter = self.find_parameter('W', 0)
+        self.bias_parameter = self.find_parameter('b', 1)
 
         # Get the hyper-parameters for the convolution.
         # They are on the convolution node inside this block.
@@ -330,7 +413,7 @@ class ConvolutionLayer(BaseLayer):
         else:
             padding = self.attributes['upperPad'][0]
 
-        return ell.neural.PaddingParameters(paddingScheme, padding)
+        return utilities.get_padding_parameters(paddingScheme, padding)
 
     def process(self, ellLayers):
         """Helper to convert a convolutional layer to the ELL equivalent."""
@@ -343,34 +426,24 @@ class ConvolutionLayer(BaseLayer):
         # Therefore, make sure the output padding characteristics of the last layer reflect the next layer's
         # padding requirements.
 
-        weightsTensor = converters.get_tensor_from_cntk_convolutional_weight_parameter(
-            self.weights_parameter)
+        weightsTensor = self.get_scaled_weights_tensor(
+            self.weights_parameter, converters.get_tensor_from_cntk_convolutional_weight_parameter,
+            converters.get_tensor_from_cntk_convolutional_weight_value_shape)
 
         internalNodes = utilities.get_model_layers(self.layer.block_root)
         activationType = utilities.get_ell_activation_type(internalNodes)
         isSoftmaxActivation = utilities.is_softmax_activation(internalNodes)
         hasActivation = isSoftmaxActivation or activationType != None
-        hasBias = self.bias_parameter != None
-
-        # Create the ell.neural.LayerParameters for the various ELL layers
-        onlyLayerParameters = ell.neural.LayerParameters(
-            self.layer.ell_inputShape, self.layer.ell_inputPaddingParameters, self.layer.ell_outputShape, 
-            self.layer.ell_outputPaddingParameters, ell.nodes.PortType.smallReal)
-        firstLayerParameters = ell.neural.LayerParameters(
-            self.layer.ell_inputShape, self.layer.ell_inputPaddingParameters, self.layer.ell_outputShapeMinusPadding, 
-            ell.neural.NoPadding(), ell.nodes.PortType.smallReal)
-        middleLayerParameters = ell.neural.LayerParameters(self.layer.ell_outputShapeMinusPadding, ell.neural.NoPadding(
-        ), self.layer.ell_outputShapeMinusPadding, ell.neural.NoPadding(), ell.nodes.PortType.smallReal)
-        lastLayerParameters = ell.neural.LayerParameters(self.layer.ell_outputShapeMinusPadding, ell.neural.NoPadding(
-        ), self.layer.ell_outputShape, self.layer.ell_outputPaddingParameters, ell.nodes.PortType.smallReal)
+        # A bias of all zeros is a no-op, so leave out the ELL bias layer and its pass over the output
+        hasBias = self.bias_parameter != None and np.any(self.bias_parameter.value)
 
         # Choose the layer parameters for the convolutional layer. If there is 
         # bias or activation, then the convolution is the first of two or more,
         # otherwise it is the only layer
         if hasActivation or hasBias:
-            layerParameters = firstLayerParameters
+            layerParameters = self.get_first_layer_parameters()
         else:
-            layerParameters = onlyLayerParameters
+            layerParameters = self.get_only_layer_parameters()
 
         # Fill in the convolutional parameters
         weightsShape = self.weights_parameter.shape
@@ -389,16 +462,16 @@ class ConvolutionLayer(BaseLayer):
         # Create the ELL bias layer
         if hasBias:
             if hasActivation:
-                layerParameters = middleLayerParameters
+                layerParameters = self.get_middle_layer_parameters()
             else:
-                layerParameters = lastLayerParameters
+                layerParameters = self.get_last_layer_parameters()
             biasVector = converters.get_vector_from_cntk_trainable_parameter(
                 self.bias_parameter)
             ellLayers.append(ell.neural.BiasLayer(layerParameters, biasVector))
 
         # Create the ELL activation layer
         if hasActivation:
-            layerParameters = lastLayerParameters
+            layerParameters = self.get_last_layer_parameters()
 
             # Special case: if this is softmax activation, create an ELL Softmax layer.
             # Else, insert an ELL ActivationLayer
@@ -419,6 +492,8 @@ class ConvolutionLayer(BaseLayer):
             self.attributes['autoPadding'][1] and self.attributes['autoPadding'][2])
         bias = (self.bias_parameter is not None)
 
+        feature = self.get_scaled_clone_input(feature)
+
         layer = Convolution((weightsShape[2], weightsShape[3]), weightsShape[0],
                             pad=pad, activation=activation, bias=bias)(feature)
 
@@ -431,6 +506,9 @@ class ConvolutionLayer(BaseLayer):
 class LinearLayer(BaseLayer):
     """Logic for converting a CNTK Linear layer to ELL"""
 
+    __slots__ = ()
+    folds_input_scale = True
+
     def __init__(self, layer):
         self.op_name = 'Linear'
         super().__init__(layer)
@@ -446,21 +524,14 @@ class LinearLayer(BaseLayer):
         # Therefore, make sure the output padding characteristics of the last layer reflect the next layer's
         # padding requirements.
 
-        weightsParameter = utilities.find_parameter_by_name(self.layer.parameters, 'W', 0)
-        biasParameter = utilities.find_parameter_by_name(self.layer.parameters, 'b', 1)
-        weightsTensor = converters.get_tensor_from_cntk_dense_weight_parameter(weightsParameter)
+        weightsParameter = self.find_parameter('W', 0)
+        biasParameter = self.find_parameter('b', 1)
+        weightsTensor = self.get_scaled_weights_tensor(
+            weightsParameter, converters.get_tensor_from_cntk_dense_weight_parameter,
+            converters.get_tensor_from_cntk_dense_weight_value_shape)
         biasVector = converters.get_vector_from_cntk_trainable_parameter(biasParameter)
 
-        # Create the ell.neural.LayerParameters for the various ELL layers
-        firstLayerParameters = ell.neural.LayerParameters(
-            self.layer.ell_inputShape, self.layer.ell_inputPaddingParameters, 
-            self.layer.ell_outputShapeMinusPadding, ell.neural.NoPadding(), ell.nodes.PortType.smallReal)
-        middleLayerParameters = ell.neural.LayerParameters(self.layer.ell_outputShapeMinusPadding, ell.neural.NoPadding(
-        ), self.layer.ell_outputShapeMinusPadding, ell.neural.NoPadding(), ell.nodes.PortType.smallReal)
-        lastLayerParameters = ell.neural.LayerParameters(self.layer.ell_outputShapeMinusPadding, ell.neural.NoPadding(
-        ), self.layer.ell_outputShape, self.layer.ell_outputPaddingParameters, ell.nodes.PortType.smallReal)
-
-        layerParameters = firstLayerParameters
+        layerParameters = self.get_first_layer_parameters()
 
         internalNodes = utilities.get_model_layers(self.layer.block_root)
         activationType = utilities.get_ell_activation_type(internalNodes)
@@ -473,14 +544,14 @@ class LinearLayer(BaseLayer):
         isSoftmaxActivation = utilities.is_softmax_activation(internalNodes)
         hasActivation = isSoftmaxActivation or activationType != None
         if (hasActivation):
-            layerParameters = middleLayerParameters
+            layerParameters = self.get_middle_layer_parameters()
         else:
-            layerParameters = lastLayerParameters
+            layerParameters = self.get_last_layer_parameters()
         ellLayers.append(ell.neural.BiasLayer(layerParameters, biasVector))
 
         # Create the ELL activation layer
         if (hasActivation):
-            layerParameters = lastLayerParameters
+            layerParameters = self.get_last_layer_parameters()
 
             # Special case: if this is softmax activation, create an ELL Softmax layer.
             # Else, insert an ELL ActivationLayer
@@ -497,6 +568,8 @@ class LinearLayer(BaseLayer):
 class ElementTimesLayer(BaseLayer):
     """Logic for converting a CNTK ElementTimes layer to ELL"""
 
+    __slots__ = ('scale',)
+
     def __init__(self, layer):
         if (len(layer.parameters) != 1 and len(layer.constants) != 1):
             raise ValueError(
@@ -510,13 +583,21 @@ class ElementTimesLayer(BaseLayer):
 
         super().__init__(layer)
 
+    def fold_into(self, nextLayer):
+        """Folds this layer's scale into the next layer's weights, which is possible when the scale is
+           a scalar and the next layer supports it. Returns True if this layer was folded and no longer
+           needs to be processed.
+        """
+
+        if (self.scale.value.size != 1):
+            return False
+        return nextLayer.fold_input_scale(self.scale.value.item())
+
     def process(self, ellLayers):
         """Appends the ELL representation of the current layer to ellLayers."""
 
-        # Create the ell.neural.LayerParameters for the ELL layer
-        layerParameters = ell.neural.LayerParameters(
-            self.layer.ell_inputShape, self.layer.ell_inputPaddingParameters, self.layer.ell_outputShape, 
-            self.layer.ell_outputPaddingParameters, ell.nodes.PortType.smallReal)
+        # Get the ell.neural.LayerParameters for the ELL layer
+        layerParameters = self.get_only_layer_parameters()
 
         # Create ELL scaling layer
         if (self.scale.value.size == 1):
@@ -538,6 +619,8 @@ class ElementTimesLayer(BaseLayer):
 class BasePoolingLayer(BaseLayer):
     """Common logic for converting a Pooling layer to ELL"""
 
+    __slots__ = ('attributes', 'padding_scheme', 'pooling_type')
+
     def __init__(self, layer):
         if layer.is_block:
             self.attributes = layer.block_root.attributes
@@ -557,7 +640,7 @@ class BasePoolingLayer(BaseLayer):
         else:
             padding = self.attributes['upperPad'][0]
 
-        return ell.neural.PaddingParameters(self.padding_scheme, padding)
+        return utilities.get_padding_parameters(self.padding_scheme, padding)
 
     def get_cntk_parameters(self):
         pad = False
@@ -571,10 +654,8 @@ class BasePoolingLayer(BaseLayer):
     def process(self, ellLayers):
         """Appends the ELL representation of the current layer to ellLayers."""
 
-        # Create the ell.neural.LayerParameters for the ELL layer
-        layerParameters = ell.neural.LayerParameters(
-            self.layer.ell_inputShape, self.layer.ell_inputPaddingParameters, self.layer.ell_outputShape, 
-            self.layer.ell_outputPaddingParameters, ell.nodes.PortType.smallReal)
+        # Get the ell.neural.LayerParameters for the ELL layer
+        layerParameters = self.get_only_layer_parameters()
 
         # Fill in the pooling parameters
         poolingSize = self.attributes['poolingWindowShape'][0]
@@ -595,6 +676,8 @@ class BasePoolingLayer(BaseLayer):
 class MaxPoolingLayer(BasePoolingLayer):
     """Logic for converting a CNTK MaxPooling layer to ELL"""
 
+    __slots__ = ()
+
     def __init__(self, layer):
         self.op_name = 'MaxPooling'
         self.padding_scheme = ell.neural.PaddingScheme.min
@@ -611,6 +694,8 @@ class MaxPoolingLayer(BasePoolingLayer):
 class AveragePoolingLayer(BasePoolingLayer):
     """Logic for converting a CNTK AveragePooling layer to ELL"""
 
+    __slots__ = ()
+
     def __init__(self, layer):
         self.op_name = 'AveragePooling'
         self.padding_scheme = ell.neural.PaddingScheme.zeros
@@ -624,33 +709,22 @@ class AveragePoolingLayer(BasePoolingLayer):
         pad, filterShape, stride = self.get_cntk_parameters()
         return AveragePooling(filterShape, strides=(stride, stride), pad=pad)(feature)
 
-class PoolingLayer(BaseLayer):
-    """Logic for converting a CNTK Pooling layer to ELL"""
-
-    def __init__(self, layer):
-        self.op_name = 'Pooling'
-        super().__init__(layer)
-
-        if (layer.attributes['poolingType'] == PoolingType_Max):
-            self.actual_layer = MaxPoolingLayer(layer)
-        else:
-            self.actual_layer = AveragePoolingLayer(layer)
-
-    def __repr__(self):
-        return self.actual_layer.__repr__()
-
-    def process(self, ellLayers):
-        """Appends the ELL representation of the current layer to ellLayers."""
-        self.actual_layer.process(ellLayers)
+def get_pooling_layer_object(layer):
+    """Returns the layer object for converting a CNTK Pooling layer to ELL, based on its pooling type"""
 
-    def clone_cntk_layer(self, feature):
-        """Returns a clone of the CNTK layer for per-layer forward prop"""
+    if (layer.attributes['poolingType'] == PoolingType_Max):
+        return MaxPoolingLayer(layer)
+    else:
+        return AveragePoolingLayer(layer)
 
-        return self.actual_layer.clone_cntk_layer(feature)
+# Kept for existing callers, Pooling layers are built as MaxPoolingLayer or AveragePoolingLayer
+PoolingLayer = get_pooling_layer_object
 
 class ActivationLayer(BaseLayer):
     """Logic for converting a CNTK Activation layer to ELL"""
 
+    __slots__ = ('activation_type',)
+
     def __init__(self, layer):
         if not layer.is_block:
             raise ValueError("Activation node is not a block node")
@@ -664,10 +738,8 @@ class ActivationLayer(BaseLayer):
     def process(self, ellLayers):
         """Appends the ELL representation of the current layer to ellLayers."""
 
-        # Create the ell.neural.LayerParameters for the ELL layer
-        layerParameters = ell.neural.LayerParameters(
-            self.layer.ell_inputShape, self.layer.ell_inputPaddingParameters, self.layer.ell_outputShape, 
-            self.layer.ell_outputPaddingParameters, ell.nodes.PortType.smallReal)
+        # Get the ell.neural.LayerParameters for the ELL layer
+        layerParameters = self.get_only_layer_parameters()
 
         # Create the ELL activation layer
         ellLayers.append(ell.neural.ActivationLayer(
@@ -685,6 +757,8 @@ class ActivationLayer(BaseLayer):
 class ReLULayer(BaseLayer):
     """Logic for converting a CNTK ReLU layer to ELL"""
 
+    __slots__ = ()
+
     def __init__(self, layer):
         self.op_name = 'ReLU'
         super().__init__(layer)
@@ -692,10 +766,8 @@ class ReLULayer(BaseLayer):
     def process(self, ellLayers):
         """Appends the ELL representation of the current layer to ellLayers."""
 
-        # Create the ell.neural.LayerParameters for the ELL layer
-        layerParameters = ell.neural.LayerParameters(
-            self.layer.ell_inputShape, self.layer.ell_inputPaddingParameters, self.layer.ell_outputShape, 
-            self.layer.ell_outputPaddingParameters, ell.nodes.PortType.smallReal)
+        # Get the ell.neural.LayerParameters for the ELL layer
+        layerParameters = self.get_only_layer_parameters()
 
         # Create the ELL activation layer
         ellLayers.append(ell.neural.ActivationLayer(
@@ -709,6 +781,8 @@ class ReLULayer(BaseLayer):
 class LeakyReLULayer(BaseLayer):
     """Logic for converting a CNTK LeakyReLU layer to ELL"""
 
+    __slots__ = ()
+
     def __init__(self, layer):
         self.op_name = 'LeakyReLU'
         super().__init__(layer)
@@ -716,10 +790,8 @@ class LeakyReLULayer(BaseLayer):
     def process(self, ellLayers):
         """Appends the ELL representation of the current layer to ellLayers."""
 
-        # Create the ell.neural.LayerParameters for the ELL layer
-        layerParameters = ell.neural.LayerParameters(
-            self.layer.ell_inputShape, self.layer.ell_inputPaddingParameters, self.layer.ell_outputShape, 
-            self.layer.ell_outputPaddingParameters, ell.nodes.PortType.smallReal)
+        # Get the ell.neural.LayerParameters for the ELL layer
+        layerParameters = self.get_only_layer_parameters()
 
         # Create the ELL activation layer
         ellLayers.append(ell.neural.ActivationLayer(
@@ -733,26 +805,32 @@ class LeakyReLULayer(BaseLayer):
 class PReLULayer(BaseLayer):
     """Logic for converting a CNTK PReLU layer to ELL"""
 
+    __slots__ = ('prelu_parameter',)
+
     def __init__(self, layer):
         self.op_name = 'PReLU'
         super().__init__(layer)
-        self.prelu_parameter = utilities.find_parameter_by_name(
-            self.layer.parameters, 'prelu', 0)
+        self.prelu_parameter = self.find_parameter('prelu', 0)
 
     def process(self, ellLayers):
         """Appends the ELL representation of the current layer to ellLayers."""
 
-        preluTensor = converters.get_tensor_from_cntk_dense_weight_parameter(
-            self.prelu_parameter)
+        # Get the ell.neural.LayerParameters for the ELL layer
+        layerParameters = self.get_only_layer_parameters()
 
-        # Create the ell.neural.LayerParameters for the ELL layer
-        layerParameters = ell.neural.LayerParameters(
-            self.layer.ell_inputShape, self.layer.ell_inputPaddingParameters, self.layer.ell_outputShape, 
-            self.layer.ell_outputPaddingParameters, ell.nodes.PortType.smallReal)
+        alphaValues = self.prelu_parameter.value
+        if (alphaValues.size > 0 and np.all(alphaValues == alphaValues.flat[0])):
+            # A PReLU with the same slope everywhere is a leaky ReLU. Create the ELL leaky ReLU
+            # activation layer so that inference does not read a per-element alpha tensor.
+            ellLayers.append(ell.neural.LeakyReLUActivationLayer(
+                layerParameters, float(alphaValues.flat[0])))
+        else:
+            preluTensor = converters.get_tensor_from_cntk_dense_weight_parameter(
+                self.prelu_parameter)
 
-        # Create the ELL PReLU activation layer
-        ellLayers.append(ell.neural.PReLUActivationLayer(
-            layerParameters, preluTensor))
+            # Create the ELL PReLU activation layer
+            ellLayers.append(ell.neural.PReLUActivationLayer(
+                layerParameters, preluTensor))
 
     def clone_cntk_layer(self, feature):
         """Returns a clone of the CNTK layer for per-layer forward prop validation"""
@@ -763,6 +841,8 @@ class PReLULayer(BaseLayer):
 class SoftmaxLayer(BaseLayer):
     """Logic for converting a CNTK Softmax layer to ELL"""
 
+    __slots__ = ()
+
     def __init__(self, layer):
         self.op_name = 'Softmax'
         super().__init__(layer)
@@ -773,13 +853,11 @@ class SoftmaxLayer(BaseLayer):
         if (self.layer.op_name == 'CrossEntropyWithSoftmax'):
             # ugly hack for CrossEntropyWithSoftmax
             # CrossEntropyWithSoftmax outputs to a Tensor[1], but we just need Softmax
-            layerParameters = ell.neural.LayerParameters(
+            layerParameters = utilities.get_layer_parameters(
                 self.layer.ell_inputShape, self.layer.ell_inputPaddingParameters, self.layer.ell_inputShape, 
                 self.layer.ell_inputPaddingParameters, ell.nodes.PortType.smallReal)
         else:
-            layerParameters = ell.neural.LayerParameters(
-                self.layer.ell_inputShape, self.layer.ell_inputPaddingParameters, self.layer.ell_outputShape, 
-                self.layer.ell_outputPaddingParameters, ell.nodes.PortType.smallReal)
+            layerParameters = self.get_only_layer_parameters()
 
         # Create the ELL softmax layer
         ellLayers.append(ell.neural.SoftmaxLayer(layerParameters))
@@ -792,17 +870,17 @@ class SoftmaxLayer(BaseLayer):
 class BatchNormalizationLayer(BaseLayer):
     """Logic for converting a CNTK BatchNormalization layer to ELL"""
 
+    __slots__ = ('scale', 'bias', 'mean', 'variance', 'epsilon')
+    folds_input_scale = True
+
     def __init__(self, layer):
         self.op_name = 'BatchNormalization'
+        self.layer = layer
 
-        self.scale = utilities.find_parameter_by_name(
-            layer.parameters, 'scale', 0)
-        self.bias = utilities.find_parameter_by_name(
-            layer.parameters, 'bias', 1)
-        self.mean = utilities.find_parameter_by_name(
-            layer.constants, 'aggregate_mean', 0)
-        self.variance = utilities.find_parameter_by_name(
-            layer.constants, 'aggregate_variance', 1)
+        self.scale = self.find_parameter('scale', 0)
+        self.bias = self.find_parameter('bias', 1)
+        self.mean = self.find_constant('aggregate_mean', 0)
+        self.variance = self.find_constant('aggregate_variance', 1)
 
         # The default CNTK epsilon
         self.epsilon = 1e-5
@@ -817,33 +895,31 @@ class BatchNormalizationLayer(BaseLayer):
         # - ScalingLayer
         # - BiasLayer
         #
+        # Since the mean and variance are constant at inference time, the normalization is folded into
+        # the scale and bias at import time:
+        #   scale * (x - mean) / sqrt(variance + epsilon) + bias = foldedScale * x + foldedBias
+        # so only the following 2 ELL layers are needed:
+        # - ScalingLayer
+        # - BiasLayer
+        #
         # Therefore, make sure the output padding characteristics of the last layer reflect the next layer's
         # padding requirements.
 
-        scaleVector = converters.get_vector_from_cntk_trainable_parameter(
-            self.scale)
-        biasVector = converters.get_vector_from_cntk_trainable_parameter(
-            self.bias)
-        meanVector = converters.get_vector_from_cntk_trainable_parameter(
-            self.mean)
-        varianceVector = converters.get_vector_from_cntk_trainable_parameter(
-            self.variance)
-
-        # Create the ell.neural.LayerParameters for the various ELL layers
-        firstLayerParameters = ell.neural.LayerParameters(
-            self.layer.ell_inputShape, self.layer.ell_inputPaddingParameters, 
-            self.layer.ell_outputShapeMinusPadding, ell.neural.NoPadding(), ell.nodes.PortType.smallReal)
-        middleLayerParameters = ell.neural.LayerParameters(self.layer.ell_outputShapeMinusPadding, 
-            ell.neural.NoPadding(), self.layer.ell_outputShapeMinusPadding, ell.neural.NoPadding(), ell.nodes.PortType.smallReal)
-        lastLayerParameters = ell.neural.LayerParameters(self.layer.ell_outputShapeMinusPadding, 
-            ell.neural.NoPadding(), self.layer.ell_outputShape, self.layer.ell_outputPaddingParameters, ell.nodes.PortType.smallReal)
+        # Only the folded vectors are needed, so compute them straight from the CNTK values rather
+        # than converting each of the 4 vectors separately
+        scaleValues, biasValues, meanValues, varianceValues = (
+            np.asarray(p.value, dtype=np.float).ravel() for p in (self.scale, self.bias, self.mean, self.variance))
+
+        foldedScaleVector = scaleValues * np.reciprocal(np.sqrt(varianceValues + self.epsilon))
+        foldedBiasVector = biasValues - meanValues * foldedScaleVector
+        # A constant input scale only changes the multiplier: a * (s * x) + b
+        if (self.input_scale != 1.0):
+            foldedScaleVector *= self.input_scale
 
         # Create the layers
-        ellLayers.append(ell.neural.BatchNormalizationLayer(
-            firstLayerParameters, meanVector, varianceVector, self.epsilon, ell.neural.EpsilonSummand.variance))
         ellLayers.append(ell.neural.ScalingLayer(
-            middleLayerParameters, scaleVector))
-        ellLayers.append(ell.neural.BiasLayer(lastLayerParameters, biasVector))
+            self.get_first_layer_parameters(), foldedScaleVector))
+        ellLayers.append(ell.neural.BiasLayer(self.get_last_layer_parameters(), foldedBiasVector))
 
     def clone_cntk_layer(self, feature):
         """Returns a clone of the CNTK layer for per-layer forward prop validation"""
@@ -852,11 +928,14 @@ class BatchNormalizationLayer(BaseLayer):
         run_mean = constant(shape=self.scale.shape, value=self.mean.value, name='aggregate_mean')
         run_variance = constant(shape=self.scale.shape, value=self.variance.value, name='aggregate_variance')
         run_count = constant(0, shape=(), name='aggregate_count')
+        feature = self.get_scaled_clone_input(feature)
         return batch_normalization(feature, scale, bias, run_mean, run_variance, running_count=run_count, spatial=True)
 
 class BiasLayer(BaseLayer):
     """Logic for converting a CNTK Plus layer to ELL"""
 
+    __slots__ = ()
+
     def __init__(self, layer):
         if (len(layer.parameters) != 1):
             raise ValueError(
@@ -871,10 +950,8 @@ class BiasLayer(BaseLayer):
         biasVector = converters.get_vector_from_cntk_trainable_parameter(
             self.layer.parameters[0])
 
-        # Create the ell.neural.LayerParameters for the ELL layer
-        layerParameters = ell.neural.LayerParameters(
-            self.layer.ell_inputShape, self.layer.ell_inputPaddingParameters, self.layer.ell_outputShape, 
-            self.layer.ell_outputPaddingParameters, ell.nodes.PortType.smallReal)
+        # Get the ell.neural.LayerParameters for the ELL layer
+        layerParameters = self.get_only_layer_parameters()
 
         # Create the ELL bias layer
         ellLayers.append(ell.neural.BiasLayer(layerParameters, biasVector))
@@ -887,6 +964,8 @@ class BiasLayer(BaseLayer):
 class NegativeBiasLayer(BaseLayer):
     """Logic for converting a CNTK Minus layer to ELL"""
 
+    __slots__ = ()
+
     def __init__(self, layer):
         if (len(layer.constants) != 1 and layer.constants[0].value.size != 1):
             raise ValueError(
@@ -904,16 +983,17 @@ class NegativeBiasLayer(BaseLayer):
     def process(self, ellLayers):
         """Appends the ELL representation of the current layer to ellLayers."""
 
-        # Create the ell.neural.LayerParameters for the ELL layer
-        layerParameters = ell.neural.LayerParameters(
-            self.layer.ell_inputShape, self.layer.ell_inputPaddingParameters, self.layer.ell_outputShape, 
-            self.layer.ell_outputPaddingParameters, ell.nodes.PortType.smallReal)
+        # Get the ell.neural.LayerParameters for the ELL layer
+        layerParameters = self.get_only_layer_parameters()
 
-        bias = -1.0 * self.layer.constants[0].value
-        if len(bias.shape) == 0:
-            biasVector = converters.get_vector_from_constant(bias, layerParameters.outputShape.channels)
+        # Negate the converted vector in place, rather than making a negated copy of the CNTK value
+        # and then converting that
+        value = self.layer.constants[0].value
+        if len(value.shape) == 0:
+            biasVector = converters.get_vector_from_constant(-float(value), layerParameters.outputShape.channels)
         else:
-            biasVector = converters.get_vector_from_cntk_array(bias)
+            biasVector = converters.get_vector_from_cntk_array(value)
+            np.negative(biasVector, out=biasVector)
 
         # Create the ELL bias layer
         ellLayers.append(ell.neural.BiasLayer(layerParameters, biasVector))
@@ -922,58 +1002,94 @@ class NegativeBiasLayer(BaseLayer):
         """Returns a clone of the CNTK layer for per-layer forward prop validation"""
         return minus(feature, constant(self.layer.constants[0].value), name=self.layer.output.name)
 
-class LayerFactory():
-    @staticmethod
-    def get_layer_object(cntkLayer):
-        try:
-            if (cntkLayer.op_name == 'Activation'):
-                return ActivationLayer(cntkLayer)
-            elif (cntkLayer.op_name == 'AveragePooling'):
-                return AveragePoolingLayer(cntkLayer)
-            elif (cntkLayer.op_name == 'BatchNormalization'):
-                return BatchNormalizationLayer(cntkLayer)
-            elif (cntkLayer.op_name == 'Convolution'):
-                if (cntkLayer.is_block):
-                    return ConvolutionLayer(cntkLayer)
-                else:
-                    return BinaryConvolutionLayer(cntkLayer)
-            elif (cntkLayer.op_name == 'Dense'):
-                return DenseLayer(cntkLayer)
-            elif (cntkLayer.op_name == 'ElementTimes'):
-                return ElementTimesLayer(cntkLayer)
-            elif (cntkLayer.op_name == 'LeakyReLU'):
-                return LeakyReLULayer(cntkLayer)
-            elif (cntkLayer.op_name == 'linear'): # Note: this op_name is lowercase
-                return LinearLayer(cntkLayer)
-            elif (cntkLayer.op_name == 'MaxPooling'):
-                return MaxPoolingLayer(cntkLayer)
-            elif (cntkLayer.op_name == 'Minus'):
-                return NegativeBiasLayer(cntkLayer)
-            elif (cntkLayer.op_name == 'Plus'):
-                return BiasLayer(cntkLayer)
-            elif (cntkLayer.op_name == 'Pooling'):
-                return PoolingLayer(cntkLayer)
-            elif (cntkLayer.op_name == 'PReLU'):
-                return PReLULayer(cntkLayer)
-            elif (cntkLayer.op_name == 'ReLU'):
-                return ReLULayer(cntkLayer)
-            elif (cntkLayer.op_name == 'Softmax'):
-                return SoftmaxLayer(cntkLayer)
+# The layer object to construct for each CNTK op_name. Convolution is handled separately in
+# get_layer_object, since it depends on whether the layer is a block.
+_layerConstructors = {
+    'Activation': ActivationLayer,
+    'AveragePooling': AveragePoolingLayer,
+    'BatchNormalization': BatchNormalizationLayer,
+    'Dense': DenseLayer,
+    'ElementTimes': ElementTimesLayer,
+    'LeakyReLU': LeakyReLULayer,
+    'linear': LinearLayer, # Note: this op_name is lowercase
+    'MaxPooling': MaxPoolingLayer,
+    'Minus': NegativeBiasLayer,
+    'Plus': BiasLayer,
+    'Pooling': get_pooling_layer_object,
+    'PReLU': PReLULayer,
+    'ReLU': ReLULayer,
+    'Softmax': SoftmaxLayer,
+}
+
+def get_layer_object(cntkLayer, opName=None):
+    """Returns the layer object for converting the CNTK layer to ELL, or None if the layer is not
+       converted
+    """
+    if opName is None:
+        opName = cntkLayer.op_name
+    try:
+        if (opName == 'Convolution'):
+            # Read is_block once, for both choosing the layer and the layer's own check
+            isBlock = cntkLayer.is_block
+            if (isBlock):
+                return ConvolutionLayer(cntkLayer, isBlock)
             else:
-                _logger.warning("Will not process " + cntkLayer.op_name +
-                      "- skipping this layer as irrelevant.")
-        except (ValueError, AttributeError) as e:
-            # raised if a layer contains invalid characteristics
-            _logger.info("\nWill not process", cntkLayer.op_name, "-", str(e))
+                return BinaryConvolutionLayer(cntkLayer, isBlock)
+
+        layerConstructor = _layerConstructors.get(opName)
+        if layerConstructor is not None:
+            return layerConstructor(cntkLayer)
+        _logger.warning("Will not process %s - skipping this layer as irrelevant.", opName)
+    except (ValueError, AttributeError) as e:
+        # raised if a layer contains invalid characteristics
+        _logger.info("\nWill not process %s - %s", opName, e)
 
-        return None
+    return None
 
-    @staticmethod
-    def has_inputs(cntkLayer):
-        return ((len(cntkLayer.arguments) > 0 and len(cntkLayer.arguments[0].shape) > 0) or
-                # special case for Binary Convolution
-                (cntkLayer.op_name == 'Convolution' and len(cntkLayer.inputs) > 0 and 
-                len(cntkLayer.inputs[0].shape) > 0))
+
+def has_inputs(cntkLayer, opName=None):
+    """Returns True if the CNTK layer has an input with a non-empty shape"""
+    arguments = cntkLayer.arguments
+    if (len(arguments) > 0 and len(arguments[0].shape) > 0):
+        return True
+
+    # special case for Binary Convolution
+    if opName is None:
+        opName = cntkLayer.op_name
+    if (opName != 'Convolution'):
+        return False
+    inputs = cntkLayer.inputs
+    return (len(inputs) > 0 and len(inputs[0].shape) > 0)
+
+
+class LayerFactory():
+    """Kept for existing callers, get_layer_object and has_inputs are module functions"""
+    get_layer_object = staticmethod(get_layer_object)
+    has_inputs = staticmethod(has_inputs)
+
+
+def _append_layer_object(relevantLayers, layerObject):
+    """Appends layerObject to relevantLayers, and sets the output characteristics of the layers
+       before it as soon as their next layer is known:
+       - padding parameters for output, based on the next layer's input
+       - output shape, which is adjusted to include the padding
+       The last layer in relevantLayers may still be folded into layerObject, so the output
+       characteristics lag one layer behind: the caller sets them for the last two layers.
+    """
+
+    if relevantLayers:
+        previousLayer = relevantLayers[-1]
+        if (isinstance(previousLayer, ElementTimesLayer) and previousLayer.fold_into(layerObject)):
+            # An ElementTimes layer with a scalar scale is folded into the weights of the layer that
+            # follows it. This saves a pass over the feature map at inference.
+            _logger.info("Folded %s into %s", previousLayer.op_name, layerObject.op_name)
+            relevantLayers.pop()
+        elif (len(relevantLayers) > 1):
+            # previousLayer is now known to stay, so use its input characteristics to set the output
+            # for the layer before it
+            relevantLayers[-2].set_output_characteristics(previousLayer)
+
+    relevantLayers.append(layerObject)
 
 
 def get_filtered_layers_list(modelLayers, maxLayerCount=None):
@@ -982,44 +1098,43 @@ def get_filtered_layers_list(modelLayers, maxLayerCount=None):
 
     # Go through the layers and append layer objects to the relevantLayers list
     relevantLayers = []
-    lastSoftmaxLayer = None
-    for currentLayer in modelLayers:
-        if (isinstance(currentLayer, cntk_py.Function)):
-            if (LayerFactory.has_inputs(currentLayer)):
-                layerObject = LayerFactory.get_layer_object(currentLayer)
-                if (layerObject is not None):
-                    relevantLayers.append(layerObject)
-                elif currentLayer.op_name == 'CrossEntropyWithSoftmax':
-                    # ugly hack for CrossEntropyWithSoftmax
-                    # CrossEntropyWithSoftmax pops up in the beginning of the layers list
-                    # because the input is connected to it (it's used for evaluating training)
-                    lastSoftmaxLayer = SoftmaxLayer(currentLayer)
-            else:
-                _logger.warning("Will not process " + currentLayer.op_name + 
-                                " - empty input shape.")
-
-    if (lastSoftmaxLayer is not None):
-        # Retroactively insert a softmax layer
-        relevantLayers.append(lastSoftmaxLayer)
-
-    if (maxLayerCount is not None):
-        maxLayerCount = min(maxLayerCount, len(relevantLayers))
-        relevantLayers = relevantLayers[0:maxLayerCount]
-
-    # Go through the layers and set the output characteristics:
-    # - padding parameters for output, based on the next layer's input
-    # - output shape, which is adjusted to include the padding
-    currentLayer = None
-    for i in range(len(relevantLayers)):
-        currentLayer = relevantLayers[i]
-        if (i < (len(relevantLayers) - 1)):
-            # Use the next layer's input characteristics to set the output for this layer
-            nextLayer = relevantLayers[i + 1]
-            currentLayer.set_output_characteristics(nextLayer)
-        else:
-            # This is the last layer, so the output characteristics are known
-            currentLayer.set_output_characteristics(None)
-        _logger.info(currentLayer)
+    with utilities.shared_layer_parameters():
+        lastSoftmaxLayer = None
+        for currentLayer in modelLayers:
+            if (maxLayerCount is not None and len(relevantLayers) >= maxLayerCount):
+                # Don't construct layer objects that would be dropped. Folded layers are not in
+                # relevantLayers, so they don't count towards maxLayerCount.
+                break
+            if (isinstance(currentLayer, cntk_py.Function)):
+                # Interned op names compare by identity against the string literals and keys of
+                # _layerConstructors, which the compiler interns
+                opName = sys.intern(currentLayer.op_name)
+                if (has_inputs(currentLayer, opName)):
+                    layerObject = get_layer_object(currentLayer, opName)
+                    if (layerObject is not None):
+                        _append_layer_object(relevantLayers, layerObject)
+                    elif opName == 'CrossEntropyWithSoftmax':
+                        # ugly hack for CrossEntropyWithSoftmax
+                        # CrossEntropyWithSoftmax pops up in the beginning of the layers list
+                        # because the input is connected to it (it's used for evaluating training)
+                        lastSoftmaxLayer = SoftmaxLayer(currentLayer)
+                else:
+                    _logger.warning("Will not process %s - empty input shape.", opName)
+
+        if (lastSoftmaxLayer is not None and (maxLayerCount is None or len(relevantLayers) < maxLayerCount)):
+            # Retroactively insert a softmax layer
+            _append_layer_object(relevantLayers, lastSoftmaxLayer)
+
+        # Set the output characteristics of the remaining layers. The last layer's output
+        # characteristics are known, since there is no next layer.
+        if (len(relevantLayers) > 1):
+            relevantLayers[-2].set_output_characteristics(relevantLayers[-1])
+        if relevantLayers:
+            relevantLayers[-1].set_output_characteristics(None)
+
+    # Summarize the layers in a single message, and only build it if it will be logged
+    if (relevantLayers and _logger.isEnabledFor(logging.INFO)):
+        _logger.info("\n".join(str(layerObject) for layerObject in relevantLayers))
 
     return relevantLayers
 
@@ -1028,7 +1143,8 @@ def convert_cntk_layers_to_ell_layers(layersToConvert):
     """Walks a list of CNTK layers and returns a list of ELL Layer objects that is used to construct a Neural Network Predictor"""
 
     ellLayers = []
-    for layerObject in layersToConvert:
-        layerObject.process(ellLayers)
+    with utilities.shared_layer_parameters():
+        for layerObject in layersToConvert:
+            layerObject.process(ellLayers)
 
     return ellLayers
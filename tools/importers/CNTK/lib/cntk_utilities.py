@@ -10,6 +10,7 @@
 
 """Internal utilities for the CNTK importer"""
 
+import contextlib
 import logging
 
 from cntk import parameter, constant, load_model
@@ -46,6 +47,26 @@ def find_parameter_by_name(parameters, name, index=0):
     # Parameter is missing, so return None.
     return None
 
+def index_parameters_by_name(parameters):
+    """Returns the parameters as a list, together with a dictionary indexing them by name,
+       for use with find_indexed_parameter_by_name
+    """
+    parameters = list(parameters)
+    parametersByName = {}
+    for p in parameters:
+        # Keep the first parameter of a given name, as find_parameter_by_name does
+        parametersByName.setdefault(p.name, p)
+    return parameters, parametersByName
+
+def find_indexed_parameter_by_name(indexedParameters, name, index=0):
+    """Returns the same parameter as find_parameter_by_name, from parameters indexed by
+       index_parameters_by_name. Exact name matches don't scan the parameters.
+    """
+    parameters, parametersByName = indexedParameters
+    if name in parametersByName:
+        return parametersByName[name]
+    return find_parameter_by_name(parameters, name, index)
+
 def find_node_by_op_name(parameters, name):
     for p in parameters:
         if (p.op_name == name):
@@ -120,9 +141,92 @@ def get_shape(inputShape):
     return ell.math.TensorShape(rows, columns, channels)
 
 
+# ell.neural.PaddingParameters, ell.neural.LayerParameters and ell.math.TensorShape values are copied by
+# the layers that use them, so while a shared_layer_parameters() scope is active, i.e. while importing one
+# model, the importer shares a single instance for each distinct value. Outside a scope, each call
+# constructs a new instance.
+_sharedValues = None
+
+
+@contextlib.contextmanager
+def shared_layer_parameters():
+    """Context manager within which get_padding_parameters, get_adjusted_shape and get_layer_parameters
+       return a shared instance for each distinct value. The shared instances are discarded when the
+       outermost scope exits.
+    """
+    global _sharedValues
+    if _sharedValues is not None:
+        # Already in a scope, so share its values
+        yield
+        return
+
+    _sharedValues = {}
+    try:
+        yield
+    finally:
+        _sharedValues = None
+
+
+def _get_shared_value(key, create):
+    """Returns the shared value for key within a shared_layer_parameters() scope, creating it on first use.
+       Outside a scope, returns a new value.
+    """
+    if _sharedValues is None:
+        return create()
+
+    value = _sharedValues.get(key)
+    if value is None:
+        value = create()
+        _sharedValues[key] = value
+    return value
+
+
+def get_padding_parameters(paddingScheme, padding):
+    """Returns the ell.neural.PaddingParameters for the padding scheme and size.
+       The result may be shared with other layers, so it must not be modified.
+    """
+
+    return _get_shared_value(('padding', paddingScheme, padding),
+                             lambda: ell.neural.PaddingParameters(paddingScheme, padding))
+
+
+def get_no_padding():
+    """Returns the ell.neural.PaddingParameters equivalent to ell.neural.NoPadding().
+       The result may be shared with other layers, so it must not be modified.
+    """
+
+    return get_padding_parameters(ell.neural.PaddingScheme.zeros, 0)
+
+
+def _get_shape_key(shape):
+    return (shape.rows, shape.columns, shape.channels)
+
+
+def _get_padding_key(paddingParameters):
+    return (paddingParameters.paddingScheme, paddingParameters.paddingSize)
+
+
+def get_layer_parameters(inputShape, inputPaddingParameters, outputShape, outputPaddingParameters, dataType):
+    """Returns the ell.neural.LayerParameters for the given shapes, padding and data type.
+       The result may be shared with other layers, so it must not be modified.
+    """
+
+    key = ('layer', _get_shape_key(inputShape), _get_padding_key(inputPaddingParameters),
+           _get_shape_key(outputShape), _get_padding_key(outputPaddingParameters), dataType)
+    return _get_shared_value(key, lambda: ell.neural.LayerParameters(
+        inputShape, inputPaddingParameters, outputShape, outputPaddingParameters, dataType))
+
+
 def get_adjusted_shape(inputShape, paddingParameters):
-    """"Returns the ell.math.TensorShape corresponding to the input shape adjusted with padding"""
+    """"Returns the ell.math.TensorShape corresponding to the input shape adjusted with padding.
+       The result may be shared with other layers, so it must not be modified.
+    """
+
+    key = ('shape', tuple(inputShape), paddingParameters.paddingSize)
+    return _get_shared_value(key, lambda: _get_adjusted_shape(inputShape, paddingParameters))
+
 
+def _get_adjusted_shape(inputShape, paddingParameters):
     if (len(inputShape) == 3):
         # Adjust the input shape to account for padding in the row and column dimensions
         # CNTK's shape tensor is in channels, rows, columns order
@@ -146,31 +250,33 @@ def get_adjusted_shape(inputShape, paddingParameters):
 
 def get_model_layers(root):
     """Returns a list of the high-level layers (i.e. function blocks) that make up the CNTK model """
+    # The top of the stack is the end of the list, so pushing and popping doesn't shift the whole list.
+    # Inputs are pushed in reverse so that they are still visited in order.
     stack = [root.root_function]  # node
     layers = []         # final result, list of all relevant layers
     visited = set()
 
     while stack:
-        node = stack.pop(0)
-        if node.uid in visited:
+        node = stack.pop()
+        uid = node.uid
+        if uid in visited:
             continue
 
-        from cntk import cntk_py
         try:
             # Function node
-            stack = list(node.root_function.inputs) + stack
+            stack.extend(reversed(node.root_function.inputs))
         except AttributeError:
             # OutputVariable node. We need process the owner node if this is an output.
             try:
                 if node.is_output:
-                    stack.insert(0, node.owner)
+                    stack.append(node.owner)
                     continue
             except AttributeError:
                 pass
         # Add function nodes but skip Variable nodes
-        if (not isinstance(node, Variable)) and (not node.uid in visited):
+        if not isinstance(node, Variable):
             layers.append(node)
-            visited.add(node.uid)
+            visited.add(uid)
 
     # CNTK layers are in opposite order to what ELL wants, so reverse the list
     layers.reverse()
@@ -220,12 +220,16 @@ class FullModelTest:
                 if node_input.is_input and isinstance(node_input, cntk.variables.Variable):
                     # great, this tells us the input size.
                     self.input_shape = node_input.shape
-                    if len(self.input_shape) == 1:
-                        # hmmm, strange 1D input, let's assume it is a square image...
-                        size = self.input_shape[0]
-                        w = int(math.sqrt(size))
-                        self.input_shape = (1,int(size/w),w) # channels,rows,cols
                     break
+            else:
+                # the first layer has folded in an input ElementTimes layer, so it is not connected to
+                # the model input, but its input has the same shape.
+                self.input_shape = layer.input_shape
+            if len(self.input_shape) == 1:
+                # hmmm, strange 1D input, let's assume it is a square image...
+                size = self.input_shape[0]
+                w = int(math.sqrt(size))
+                self.input_shape = (1,int(size/w),w) # channels,rows,cols
 
         self.data = self.get_input_data()
 
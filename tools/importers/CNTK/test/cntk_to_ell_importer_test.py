@@ -21,11 +21,15 @@ import logging
 import math
 import os
 import re
+import shutil
 import struct
+import tempfile
 import time
 import traceback
 import unittest
+from unittest import mock
 import sys
+import zipfile
 
 import numpy as np
 _logger = logging.getLogger(__name__)
@@ -530,6 +534,209 @@ class CntkLayersTestCase(common_importer_test.EllImporterTestBase):
             predictor, orderedInputValues, orderedCntkResults, "batch_norm",
             "test", precision=6)
 
+    def test_batch_normalization_layer_import(self):
+        """Test that importing a CNTK BatchNormalization layer folds the
+        normalization into a scaling and a bias layer that produce
+        comparable output
+        """
+
+        scaleValues = np.linspace(0.1, 0.5, num=16, dtype=np.float32)
+        biasValues = np.linspace(1, 2, num=16, dtype=np.float32)
+        meanValues = np.linspace(-0.5, 0.5, num=16, dtype=np.float32)
+        varianceValues = np.linspace(0.5, 1, num=16, dtype=np.float32)
+
+        batchNorm = BatchNormalizationTester(
+            init_scale=scaleValues, norm_shape=scaleValues.shape,
+            init_bias=biasValues, init_mean=meanValues,
+            init_variance=varianceValues)
+
+        # Input order for CNTK is channels, rows, columns
+        x = input((16, 10, 10))
+        cntkModel = batchNorm(x)
+
+        inputValues = np.linspace(
+            -5, 5, num=16 * 10 * 10, dtype=np.float32).reshape(16, 10, 10)
+        ellLayers = self.import_and_compare(
+            cntkModel, inputValues, 'BatchNormalization layer')
+        self.assertEqual(2, len(ellLayers))
+
+    def test_element_times_folded_into_dense_layer(self):
+        """Test that a CNTK ElementTimes layer with a scalar scale is folded
+        into the weights of the following Dense layer, and that the imported
+        model produces comparable output
+        """
+
+        # Input order for CNTK is channels, rows, columns
+        x = input((4, 2, 2))
+        cntkModel = Dense(5, init=glorot_uniform(seed=1))(
+            element_times(x, constant(0.5)))
+
+        inputValues = np.linspace(
+            -5, 5, num=4 * 2 * 2, dtype=np.float32).reshape(4, 2, 2)
+        ellLayers = self.import_and_compare(
+            cntkModel, inputValues, 'ElementTimes folded into Dense')
+        self.assertFalse(any(isinstance(layer, ell.neural.ScalingLayer)
+                             for layer in ellLayers))
+
+    def test_element_times_folded_into_convolution_layer(self):
+        """Test that a CNTK ElementTimes layer with a scalar scale is folded
+        into the weights of a following padded Convolution layer, both on the
+        model input and between two convolutions, and that the imported model
+        produces comparable output
+        """
+
+        # Input order for CNTK is channels, rows, columns
+        x = input((2, 6, 6))
+        inputValues = np.linspace(
+            -5, 5, num=2 * 6 * 6, dtype=np.float32).reshape(2, 6, 6)
+
+        cntkModel = Convolution((3, 3), 4, pad=True, init=glorot_uniform(seed=1),
+                                init_bias=0.5)(element_times(x, constant(0.5)))
+        ellLayers = self.import_and_compare(
+            cntkModel, inputValues, 'ElementTimes folded into Convolution')
+        self.assertFalse(any(isinstance(layer, ell.neural.ScalingLayer)
+                             for layer in ellLayers))
+
+        # The scaled convolution reads the padded output of another convolution
+        convolution = Convolution((3, 3), 4, pad=True, init=glorot_uniform(seed=1),
+                                  init_bias=0.5)(x)
+        cntkModel = Convolution((3, 3), 3, pad=True, init=glorot_uniform(seed=2),
+                                init_bias=0.5)(element_times(convolution, constant(0.25)))
+        ellLayers = self.import_and_compare(
+            cntkModel, inputValues, 'ElementTimes folded into a padded Convolution')
+        self.assertEqual(4, len(ellLayers))
+        self.assertFalse(any(isinstance(layer, ell.neural.ScalingLayer)
+                             for layer in ellLayers))
+
+    def test_element_times_folded_into_batch_normalization_layer(self):
+        """Test that a CNTK ElementTimes layer with a scalar scale is folded
+        into the scale of the following BatchNormalization layer, and that the
+        imported model produces comparable output
+        """
+
+        scaleValues = np.linspace(0.1, 0.5, num=16, dtype=np.float32)
+        biasValues = np.linspace(1, 2, num=16, dtype=np.float32)
+        meanValues = np.linspace(-0.5, 0.5, num=16, dtype=np.float32)
+        varianceValues = np.linspace(0.5, 1, num=16, dtype=np.float32)
+
+        batchNorm = BatchNormalizationTester(
+            init_scale=scaleValues, norm_shape=scaleValues.shape,
+            init_bias=biasValues, init_mean=meanValues,
+            init_variance=varianceValues)
+
+        # Input order for CNTK is channels, rows, columns
+        x = input((16, 10, 10))
+        cntkModel = batchNorm(element_times(x, constant(0.5)))
+
+        inputValues = np.linspace(
+            -5, 5, num=16 * 10 * 10, dtype=np.float32).reshape(16, 10, 10)
+        ellLayers = self.import_and_compare(
+            cntkModel, inputValues, 'ElementTimes folded into BatchNormalization')
+        # Only the folded scaling and bias layers of the BatchNormalization remain
+        self.assertEqual(2, len(ellLayers))
+
+    def test_max_layer_count_with_folded_layers(self):
+        """Test that ElementTimes layers folded into the following layer do
+        not count towards the maximum number of filtered layers
+        """
+
+        # Input order for CNTK is channels, rows, columns
+        x = input((4, 2, 2))
+        dense = Dense(5, init=glorot_uniform(seed=1))(
+            element_times(x, constant(0.5)))
+        cntkModel = Dense(3, init=glorot_uniform(seed=2))(dense)
+        modelLayers = cntk_utilities.get_model_layers(cntkModel)
+
+        layersToConvert = cntk_layers.get_filtered_layers_list(modelLayers, 1)
+        self.assertEqual(1, len(layersToConvert))
+
+        layersToConvert = cntk_layers.get_filtered_layers_list(modelLayers, 2)
+        self.assertEqual(2, len(layersToConvert))
+        self.assertTrue(all(isinstance(layer, cntk_layers.DenseLayer)
+                            for layer in layersToConvert))
+
+    def import_and_compare(self, cntkModel, inputValues, name):
+        """Imports the CNTK model through the CNTK layer importer, checks that
+        the ELL predictor produces comparable output and returns the ELL
+        layers
+        """
+
+        layersToConvert = cntk_layers.get_filtered_layers_list(
+            cntk_utilities.get_model_layers(cntkModel))
+        ellLayers = cntk_layers.convert_cntk_layers_to_ell_layers(
+            layersToConvert)
+        predictor = ell.neural.NeuralNetworkPredictor(ellLayers)
+
+        cntkResults = cntkModel(inputValues)
+        orderedCntkResults = cntk_converters.get_vector_from_cntk_array(
+            cntkResults)
+        orderedInputValues = cntk_converters.get_vector_from_cntk_array(
+            inputValues)
+        ellResults = predictor.Predict(orderedInputValues)
+
+        np.testing.assert_array_almost_equal(
+            orderedCntkResults, ellResults, 5,
+            'results for imported %s do not match!' % (name))
+
+        return ellLayers
+
+    def test_convolution_layer_with_zero_bias_import(self):
+        """Test that importing a CNTK Convolution layer whose bias is all
+        zeros leaves out the ELL bias layer, both when the convolution is the
+        last layer and when it writes into the padded input of another layer
+        """
+
+        # Input order for CNTK is channels, rows, columns
+        x = input((2, 6, 6))
+        inputValues = np.linspace(
+            -5, 5, num=2 * 6 * 6, dtype=np.float32).reshape(2, 6, 6)
+
+        # A single convolution with an all-zero bias
+        cntkModel = Convolution((3, 3), 4, pad=True, init=glorot_uniform(seed=1),
+                                bias=True, init_bias=0)(x)
+        ellLayers = self.import_and_compare(
+            cntkModel, inputValues, 'Convolution with zero bias')
+        self.assertEqual(1, len(ellLayers))
+        self.assertIsInstance(ellLayers[0], ell.neural.ConvolutionalLayer)
+
+        # The same, followed by a padded convolution with a non-zero bias
+        convolution = Convolution((3, 3), 4, pad=True, init=glorot_uniform(seed=1),
+                                  bias=True, init_bias=0)(x)
+        cntkModel = Convolution((3, 3), 3, pad=True, init=glorot_uniform(seed=2),
+                                bias=True, init_bias=0.5)(convolution)
+        ellLayers = self.import_and_compare(
+            cntkModel, inputValues, 'Convolution with zero bias into a padded layer')
+        self.assertEqual(3, len(ellLayers))
+        self.assertEqual(1, sum(isinstance(layer, ell.neural.BiasLayer)
+                                for layer in ellLayers))
+        self.assertIsInstance(ellLayers[-1], ell.neural.BiasLayer)
+
+    def test_prelu_activation_layer_import(self):
+        """Test that importing a CNTK PReLU layer creates a leaky ReLU layer
+        when the slope is the same everywhere, and a PReLU layer otherwise,
+        and that both produce comparable output
+        """
+
+        # Input order for CNTK is channels, rows, columns
+        x = input((16, 10, 10))
+        inputValues = np.linspace(
+            -5, 5, num=16 * 10 * 10, dtype=np.float32).reshape(16, 10, 10)
+
+        alphaValues = np.full((16, 10, 10), 0.25, dtype=np.float32)
+        p = parameter(shape=x.shape, init=alphaValues, name="prelu")
+        ellLayers = self.import_and_compare(
+            param_relu(p, x), inputValues, 'PReLU with uniform alpha')
+        self.assertEqual(1, len(ellLayers))
+        self.assertIsInstance(ellLayers[0], ell.neural.LeakyReLUActivationLayer)
+
+        alphaValues = np.linspace(
+            0.1, 0.5, num=16 * 10 * 10, dtype=np.float32).reshape(16, 10, 10)
+        p = parameter(shape=x.shape, init=alphaValues, name="prelu")
+        ellLayers = self.import_and_compare(
+            param_relu(p, x), inputValues, 'PReLU with varying alpha')
+        self.assertEqual(1, len(ellLayers))
+        self.assertIsInstance(ellLayers[0], ell.neural.PReLUActivationLayer)
+
     def test_prelu_activation_layer(self):
         """Test a model with a single CNTK PReLU activation layer against the
         equivalent ELL predictor. This verifies that the import functions
@@ -585,6 +792,41 @@ class CntkLayersTestCase(common_importer_test.EllImporterTestBase):
             predictor, orderedInputValues, orderedCntkResults,
             "prelu_activation", "test")
 
+    def test_shared_layer_parameters(self):
+        """Test that layer parameters with equal shapes and padding are
+        shared while importing, that different padding gives different
+        parameters, and that nothing is shared outside an import
+        """
+
+        shape = ell.math.TensorShape(10, 10, 16)
+        paddedShape = ell.math.TensorShape(12, 12, 16)
+
+        with cntk_utilities.shared_layer_parameters():
+            noPadding = cntk_utilities.get_no_padding()
+            padding = cntk_utilities.get_padding_parameters(
+                ell.neural.PaddingScheme.zeros, 1)
+            self.assertIs(noPadding, cntk_utilities.get_no_padding())
+
+            first = cntk_utilities.get_layer_parameters(
+                shape, noPadding, paddedShape, padding,
+                ell.nodes.PortType.smallReal)
+            second = cntk_utilities.get_layer_parameters(
+                ell.math.TensorShape(10, 10, 16), noPadding,
+                ell.math.TensorShape(12, 12, 16), padding,
+                ell.nodes.PortType.smallReal)
+            self.assertIs(first, second)
+
+            third = cntk_utilities.get_layer_parameters(
+                shape, noPadding, shape, noPadding,
+                ell.nodes.PortType.smallReal)
+            self.assertIsNot(first, third)
+
+        self.assertIsNot(noPadding, cntk_utilities.get_no_padding())
+        fourth = cntk_utilities.get_layer_parameters(
+            shape, noPadding, paddedShape, padding,
+            ell.nodes.PortType.smallReal)
+        self.assertIsNot(first, fourth)
+
 
 class CntkXorModelTestCase(common_importer_test.EllImporterTestBase):
     def test_simple_xor_model(self):
@@ -613,6 +855,66 @@ class CntkXorModelTestCase(common_importer_test.EllImporterTestBase):
         ell_map.Save("xor_test_steppable.map")
 
 
+class CntkImportTestCase(common_importer_test.EllImporterTestBase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.xor_model = os.path.join(find_ell.find_ell_build(), "tools/importers/CNTK/test/xorModel1.dnn")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def import_twice(self, model_file, args):
+        """Runs cntk_import.main twice with --skip_if_current and returns the number of imports"""
+        with mock.patch.object(cntk_to_ell, "predictor_from_cntk_model",
+                               wraps=cntk_to_ell.predictor_from_cntk_model) as importer:
+            cntk_import.main([model_file, "--use_legacy_importer", "--skip_if_current"] + args)
+            cntk_import.main([model_file, "--use_legacy_importer", "--skip_if_current"] + args)
+            return importer.call_count
+
+    def test_skip_if_current(self):
+        """Test that --skip_if_current skips importing a CNTK model file
+        again when the ELL model is newer
+        """
+        model_file = os.path.join(self.temp_dir, "xor.cntk")
+        shutil.copyfile(self.xor_model, model_file)
+
+        self.assertEqual(1, self.import_twice(model_file, []))
+        self.assertTrue(os.path.isfile(os.path.join(self.temp_dir, "xor.ell")))
+
+    def test_skip_if_current_zipped(self):
+        """Test that --skip_if_current skips importing a zipped CNTK model
+        again when the zipped ELL model is newer
+        """
+        archive = os.path.join(self.temp_dir, "xor.cntk.zip")
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.write(self.xor_model, "xor.cntk")
+
+        self.assertEqual(1, self.import_twice(archive, ["--zip_ell_model"]))
+        self.assertTrue(os.path.isfile(os.path.join(self.temp_dir, "xor.ell.zip")))
+
+    def test_reimport_when_model_is_newer(self):
+        """Test that --skip_if_current imports the CNTK model when it is
+        newer than the ELL model
+        """
+        model_file = os.path.join(self.temp_dir, "xor.cntk")
+        shutil.copyfile(self.xor_model, model_file)
+        ell_file = os.path.join(self.temp_dir, "xor.ell")
+        with open(ell_file, "w") as f:
+            f.write("stale")
+        os.utime(ell_file, (0, 0))
+
+        self.assertEqual(1, self.import_twice(model_file, []))
+
+    def test_reimport_when_verifying(self):
+        """Test that --skip_if_current doesn't skip an import that was asked
+        to verify the model
+        """
+        model_file = os.path.join(self.temp_dir, "xor.cntk")
+        shutil.copyfile(self.xor_model, model_file)
+
+        self.assertEqual(2, self.import_twice(model_file, ["--verify_audio_model"]))
+
+
 class CntkToEllFullModelTestBase(common_importer_test.EllImporterTestBase):
     CATEGORIES_URL = 'models/ILSVRC2012/categories.txt'
     MODEL_URLS = [
@@ -17,20 +17,39 @@ class Extractor:
     def __init__(self, archive):
         self.archive = archive
 
+    def _find_member(self, zf, file_extension):
+        """Returns the first member of the open archive matching the file extension, or None"""
+        for member in zf.infolist():
+            _, e = os.path.splitext(member.filename)
+            if e == file_extension:
+                return member
+        return None
+
+    def get_extracted_path(self, file_extension):
+        """Returns the path extract_file would extract the first file matching the file extension to,
+           without extracting it, or "" if the archive is not a zip file or has no matching file
+        """
+        _, ext = os.path.splitext(basename(self.archive))
+        if ext == ".zip":
+            with zipfile.ZipFile(self.archive) as zf:
+                member = self._find_member(zf, file_extension)
+                if member is not None:
+                    return os.path.join(os.path.dirname(self.archive), member.filename)
+        return ""
+
     def extract_file(self, file_extension, delete_existing=True):
         """Extracts the first file matching the file extension"""
         _, ext = os.path.splitext(basename(self.archive))
         if ext == ".zip":
             with zipfile.ZipFile(self.archive) as zf:
-                for member in zf.infolist():
-                    _, e = os.path.splitext(member.filename)
-                    if e == file_extension:
-                        path = os.path.dirname(self.archive)
-                        extracted = os.path.join(path, member.filename)
-                        if delete_existing and os.path.exists(extracted):
-                            os.remove(extracted)
-                        zf.extract(member, path)
-                        return True, extracted
+                member = self._find_member(zf, file_extension)
+                if member is not None:
+                    path = os.path.dirname(self.archive)
+                    extracted = os.path.join(path, member.filename)
+                    if delete_existing and os.path.exists(extracted):
+                        os.remove(extracted)
+                    zf.extract(member, path)
+                    return True, extracted
         else:
             return False, ""
 